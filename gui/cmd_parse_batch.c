@@ -0,0 +1,34 @@
+/**
+ * Пакетный разбор команд для хоста: обёртка над cmd_parse() из прошивки.
+ * Собирается вместе с src/cmd_parse.c в разделяемую библиотеку (cmd_parse_host.py).
+ */
+#include "cmd_parse.h"
+#include <stddef.h>
+#include <string.h>
+
+/**
+ * Разбирает буфер строк, разделённых '\n' (buf должен оканчиваться '\0').
+ * Для i-й строки пишет код возврата cmd_parse в rc[i], тип команды в type[i]
+ * и значение (частота или скважность, иначе 0) в value[i].
+ * Возврат: число разобранных строк (не больше cap).
+ */
+size_t cmd_parse_batch(const char *buf, size_t len, signed char *rc,
+                       unsigned char *type, uint32_t *value, size_t cap)
+{
+    size_t n = 0;
+    const char *p = buf;
+    const char *end = buf + len;
+
+    while (n < cap) {
+        cmd_result_t r = { CMD_NONE, 0, 0 };
+        rc[n] = (signed char)cmd_parse(p, &r);
+        type[n] = (unsigned char)r.type;
+        value[n] = r.type == CMD_FREQ ? r.freq : r.type == CMD_DUTY ? r.duty : 0;
+        n++;
+        const char *nl = memchr(p, '\n', (size_t)(end - p));
+        if (!nl)
+            break;
+        p = nl + 1;
+    }
+    return n;
+}
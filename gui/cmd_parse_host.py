@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Парсер команд src/cmd_parse.c, собранный для хоста и подключённый через ctypes.
+Позволяет проверять строки команд так, как их разбирает cmd_parse(), пачками —
+без устройства и без повторной реализации правил на Python.
+
+Внимание: cmd_parse.c — парсер сборки ESP-IDF. Прошивка по умолчанию
+(env esp32c3_arduino) его не собирает: команды там разбирает processLine()
+в src/main_arduino.cpp, и он отличается (закреплено в tests/test_cmd_parse_host.py):
+  - пробелы в конце строки: "ON " — Arduino отвечает ERR, cmd_parse принимает;
+  - мусор после числа: "FREQ 10x" — Arduino принимает (endptr не проверяется),
+    cmd_parse отвергает;
+  - VER? и ID? знает только Arduino, cmd_parse считает их неизвестными;
+  - ширина unsigned long: на хосте 64 бита, на ESP32-C3 — 32, поэтому
+    "FREQ -4294967295" на устройстве даёт 1 Гц, а здесь — значение вне диапазона;
+  - строка длиннее 63 символов: Arduino режет её на несколько команд,
+    cmd_parse отбрасывает хвост.
+
+Библиотека собирается компилятором C (переменная окружения CC, по умолчанию cc)
+при первом обращении и кэшируется в gui/build/. Если компилятора нет —
+available() возвращает False.
+"""
+import ctypes
+import os
+import subprocess
+import sys
+from array import array
+from typing import Iterable, NamedTuple
+
+_GUI_DIR = os.path.dirname(os.path.abspath(__file__))
+_ROOT_DIR = os.path.dirname(_GUI_DIR)
+_SOURCES = (
+    os.path.join(_ROOT_DIR, "src", "cmd_parse.c"),
+    os.path.join(_GUI_DIR, "cmd_parse_batch.c"),
+)
+_HEADER = os.path.join(_ROOT_DIR, "include", "cmd_parse.h")
+_BUILD_DIR = os.path.join(_GUI_DIR, "build")
+_LIB_NAME = "cmd_parse_host" + (".dll" if sys.platform == "win32" else ".so")
+
+# cmd_type_t из include/cmd_parse.h
+CMD_NONE, CMD_FREQ, CMD_DUTY, CMD_ON, CMD_OFF, CMD_STATUS, CMD_HELP = range(7)
+
+# Коды возврата cmd_parse()
+PARSE_OK = 0
+PARSE_UNKNOWN = -1
+PARSE_BAD_VALUE = -2
+
+_lib = None
+
+
+class BatchResult(NamedTuple):
+    """Результаты по строкам: код возврата, тип команды, значение (Гц или %)."""
+    codes: array
+    types: array
+    values: array
+
+    def bad_lines(self) -> list[int]:
+        """Индексы строк, которые отвергнет cmd_parse()."""
+        return [i for i, rc in enumerate(self.codes) if rc != PARSE_OK]
+
+
+def _build(lib_path: str) -> None:
+    os.makedirs(_BUILD_DIR, exist_ok=True)
+    cc = os.environ.get("CC", "cc")
+    tmp_path = lib_path + f".{os.getpid()}.tmp"
+    subprocess.run(
+        [cc, "-O2", "-shared", "-fPIC", "-I", os.path.join(_ROOT_DIR, "include"),
+         *_SOURCES, "-o", tmp_path],
+        check=True,
+        capture_output=True,
+    )
+    os.replace(tmp_path, lib_path)
+
+
+def load_library(rebuild: bool = False) -> ctypes.CDLL:
+    """Собирает (если исходники новее кэша) и загружает библиотеку парсера."""
+    global _lib
+    if _lib is not None and not rebuild:
+        return _lib
+    lib_path = os.path.join(_BUILD_DIR, _LIB_NAME)
+    src_mtime = max(os.path.getmtime(p) for p in (*_SOURCES, _HEADER))
+    if rebuild or not os.path.exists(lib_path) or os.path.getmtime(lib_path) < src_mtime:
+        _build(lib_path)
+    lib = ctypes.CDLL(lib_path)
+    lib.cmd_parse_batch.argtypes = [
+        ctypes.c_char_p,
+        ctypes.c_size_t,
+        ctypes.c_void_p,
+        ctypes.c_void_p,
+        ctypes.c_void_p,
+        ctypes.c_size_t,
+    ]
+    lib.cmd_parse_batch.restype = ctypes.c_size_t
+    _lib = lib
+    return lib
+
+
+def available() -> bool:
+    """True, если библиотеку удалось собрать и загрузить."""
+    try:
+        load_library()
+        return True
+    except (OSError, subprocess.CalledProcessError):
+        return False
+
+
+def parse_batch(data: bytes) -> BatchResult:
+    """Разбор буфера строк, разделённых '\\n' (как они идут в порт)."""
+    lib = load_library()
+    count = data.count(b"\n") + 1
+    codes = array("b", bytes(count))
+    types = array("B", bytes(count))
+    values = array("I", bytes(4 * count))
+    n = lib.cmd_parse_batch(
+        data,
+        len(data),
+        codes.buffer_info()[0],
+        types.buffer_info()[0],
+        values.buffer_info()[0],
+        count,
+    )
+    assert n == count
+    return BatchResult(codes, types, values)
+
+
+def parse_lines(lines: Iterable[str | bytes]) -> BatchResult:
+    """Разбор набора отдельных строк команд (без завершающих \\n)."""
+    encoded = [ln.encode("ascii") if isinstance(ln, str) else ln for ln in lines]
+    if any(b"\n" in ln for ln in encoded):
+        raise ValueError("Строка команды не должна содержать '\\n'")
+    return parse_batch(b"\n".join(encoded))
+
+
+def parse_line(line: str | bytes) -> tuple[int, int, int]:
+    """Разбор одной строки: (код возврата, тип команды, значение)."""
+    r = parse_lines([line])
+    return r.codes[0], r.types[0], r.values[0]
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Проверка файлов команд (одна команда в строке): печатает строки, отвергнутые cmd_parse()."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Проверка файлов команд парсером src/cmd_parse.c")
+    parser.add_argument("files", nargs="+", help="файлы команд")
+    args = parser.parse_args(argv)
+
+    bad_total = 0
+    for path in args.files:
+        with open(path, "rb") as f:
+            data = f.read().rstrip(b"\n")
+        lines = data.split(b"\n")
+        result = parse_batch(data)
+        for i in result.bad_lines():
+            kind = "значение вне диапазона" if result.codes[i] == PARSE_BAD_VALUE else "неизвестная команда"
+            print(f"{path}:{i + 1}: {kind}: {lines[i].decode('ascii', errors='replace').rstrip()}")
+        bad_total += len(result.bad_lines())
+        print(f"{path}: строк {len(lines)}, ошибок {len(result.bad_lines())}")
+    return 1 if bad_total else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -3,13 +3,16 @@
 GUI для управления UART-генератором (ESP32).
 Подключение по COM-порту, команды: FREQ, DUTY, ON, OFF, ?
 """
+import time
+
+_T_START = time.perf_counter()  # точка отсчёта профилировщика старта
+
 import customtkinter as ctk
-import serial
-import serial.tools.list_ports
 import threading
 import queue
 import re
 
+from startup import StartupProfiler, load_last_port, save_last_port
 from protocol import (
     BAUD,
     FREQ_MIN,
@@ -22,16 +25,43 @@ from protocol import (
     parse_status_line,
     probe_generator_on_port,
     probe_generator_debug,
+    ProbePool,
 )
 
+_T_IMPORTS_DONE = time.perf_counter()
+
+# pyserial импортируется после первого кадра (см. _load_backend): его импорт
+# и перечисление портов заметно задерживают появление окна
+serial = None
+
+
+def _load_backend():
+    """Импорт serial и serial.tools.list_ports (повторный вызов ничего не стоит)."""
+    global serial
+    import serial
+    import serial.tools.list_ports
+
 
 class GeneratorApp(ctk.CTk):
-    def __init__(self):
+    def __init__(self, t_start: float | None = None):
+        # t_start — начало отсчёта времени старта (по умолчанию — начало импорта модуля)
+        profiler = StartupProfiler(_T_START if t_start is None else t_start)
+        if _T_IMPORTS_DONE > profiler.t_start:
+            profiler.mark("import", _T_IMPORTS_DONE)
         super().__init__()
+        profiler.mark("window")
+        self.profiler = profiler
+        self.exit_after_startup = False  # --profile-startup: закрыться после первого сканирования
+        self.last_port = load_last_port()
         self.ser: serial.Serial | None = None
         self.response_queue: queue.Queue[str] = queue.Queue()
         self.after_id = None
         self.auto_refresh_id = None  # таймер автообновления списка портов при отключении
+        # опознанные при сканировании порты остаются открытыми до подключения
+        self.probe_pool = ProbePool()
+        self.evict_id = None  # таймер закрытия простаивающих портов пула
+        self.connect_wait_id = None  # ожидание окончания проверки порта перед подключением
+        self.session_port = None  # порт сессии, отданный пулом (check_in при отключении)
 
         self.title("UART Generator — управление")
         self.geometry("520x420")
@@ -41,6 +71,11 @@ class GeneratorApp(ctk.CTk):
         ctk.set_default_color_theme("blue")
 
         self._build_ui()
+        self._schedule_pool_eviction()
+        self.profiler.mark("ui_build")
+        # импорт pyserial и сканирование — только когда окно показано на экране;
+        # after_idle из конструктора срабатывает раньше, чем окно отображено
+        self._map_bind_id = self.bind("<Map>", self._on_first_map, add="+")
 
     def _build_ui(self):
         # --- Подключение ---
@@ -48,11 +83,11 @@ class GeneratorApp(ctk.CTk):
         conn_frame.pack(fill="x", padx=12, pady=(12, 6))
 
         ctk.CTkLabel(conn_frame, text="Порт:", width=50).pack(side="left", padx=(0, 4))
-        self.port_var = ctk.StringVar(value="")
+        self.port_var = ctk.StringVar(value=self.last_port or "")
         self.port_menu = ctk.CTkOptionMenu(
             conn_frame,
             variable=self.port_var,
-            values=["— выберите порт —"],
+            values=[self.last_port] if self.last_port else ["— выберите порт —"],
             width=180,
             command=self._on_port_select,
         )
@@ -69,7 +104,9 @@ class GeneratorApp(ctk.CTk):
         self.btn_connect.pack(side="left", padx=4)
 
         self.label_status = ctk.CTkLabel(
-            conn_frame, text="Не подключено", text_color="gray"
+            conn_frame,
+            text=f"Последний генератор: {self.last_port}" if self.last_port else "Не подключено",
+            text_color="gray",
         )
         self.label_status.pack(side="left", padx=12)
 
@@ -158,31 +195,84 @@ class GeneratorApp(ctk.CTk):
         self.log_text.pack(fill="both", expand=True, pady=4)
 
         self._set_controls_connected(False)
-        self._refresh_ports()
 
-    def _start_port_scan(self):
-        """Запуск сканирования портов в фоне (только порты с подключённым генератором)."""
+    def _on_first_map(self, event):
+        """
+        Окно отображено: дорисовываем отложенное (update_idletasks), отмечаем
+        готовность и запускаем сканирование. <Map> корня приходит и от дочерних
+        виджетов — учитываем только первое событие самого окна.
+        """
+        if event.widget is not self or self._map_bind_id is None:
+            return
+        self.unbind("<Map>", self._map_bind_id)
+        self._map_bind_id = None
+        self.update_idletasks()
+        self.profiler.mark("interactive")
+        self.after_idle(self._refresh_ports)
+
+    def _start_port_scan(self, manual: bool = True):
+        """
+        Запуск сканирования портов в фоне (только порты с подключённым генератором).
+        manual=False — автообновление: порты, закрытые пулом по простою, не удерживаются.
+        """
         if getattr(self, "_scan_in_progress", False):
             return
+        if manual:
+            self.probe_pool.forget_released()
         self._scan_in_progress = True
         self.btn_refresh.configure(state="disabled", text="Сканирование...")
         self.label_status.configure(text="Поиск генераторов на COM-портах...", text_color="gray")
-        self.port_menu.configure(values=["— сканирование —"])
-        self.port_var.set("— сканирование —")
+        selected = self.port_var.get()
+        if not selected or selected.startswith("—"):
+            self.port_menu.configure(values=["— сканирование —"])
+            self.port_var.set("— сканирование —")
+        preferred = selected if selected and not selected.startswith("—") else self.last_port
+        # выбранный порт резервируем сразу, ещё до запуска потока: «Подключить»
+        # дождётся его проверки и заберёт открытый хэндл, а не откроет второй
+        if preferred:
+            self.probe_pool.reserve(preferred)
 
         def scan():
-            all_ports = [p.device for p in serial.tools.list_ports.comports()]
-            found = []
-            for port in all_ports:
-                if probe_generator_on_port(port, baud=BAUD):
-                    found.append(port)
-            self.after(0, lambda: self._on_scan_done(found, all_ports))
+            try:
+                _load_backend()
+                if self.profiler.elapsed("backend") is None:
+                    self.profiler.mark("backend")
+                all_ports = [p.device for p in serial.tools.list_ports.comports()]
+                # выбранный / последний генератор проверяем первым
+                all_ports.sort(key=lambda p: p != preferred)
+                for port in self.probe_pool.ports():
+                    if port not in all_ports:
+                        self.probe_pool.discard(port)
+                # порт из пула перепроверяется без повторного открытия (оно перезагрузило бы плату)
+                found = [
+                    port for port in all_ports
+                    if probe_generator_on_port(port, baud=BAUD, pool=self.probe_pool)
+                ]
+            except Exception as e:
+                err = e
+                self.after(0, lambda: self._log(f"Ошибка сканирования: {err}", "err"))
+                self.after(0, lambda: self._on_scan_done([], []))
+            else:
+                self.after(0, lambda: self._on_scan_done(found, all_ports))
+            finally:
+                if preferred:
+                    self.probe_pool.release(preferred)  # снимает резерв, если порт не проверялся
 
         threading.Thread(target=scan, daemon=True).start()
 
     def _on_scan_done(self, generator_ports: list, all_ports: list | None = None):
         self._scan_in_progress = False
+        if self.profiler.elapsed("first_scan") is None:
+            self.profiler.mark("first_scan")
+            self._log(self.profiler.report(), "info" if self.profiler.within_budget() else "warn")
+            if self.exit_after_startup:
+                print(self.profiler.report())
+                self.on_closing()
+                return
         self.btn_refresh.configure(state="normal", text="Обновить")
+        if self.ser and self.ser.is_open:
+            # пока шло сканирование, успели подключиться — состояние подключения не трогаем
+            return
         if not generator_ports:
             names = ["— генераторов не найдено —"]
             self.label_status.configure(text="Генераторы не найдены", text_color="gray")
@@ -198,9 +288,8 @@ class GeneratorApp(ctk.CTk):
                 text_color="lime" if names else "gray",
             )
         self.port_menu.configure(values=names)
-        if names and names[0] != "— генераторов не найдено —":
-            self.port_var.set(names[0])
-        else:
+        if self.port_var.get() not in generator_ports:
+            # выбранный порт остаётся выбранным, если генератор на нём найден
             self.port_var.set(names[0] if names else "— генераторов не найдено —")
         # Продолжить автообновление списка, если мы отключены
         self._schedule_auto_refresh_ports()
@@ -221,9 +310,14 @@ class GeneratorApp(ctk.CTk):
             if self.ser and self.ser.is_open:
                 return
             if not getattr(self, "_scan_in_progress", False):
-                self._start_port_scan()
+                self._start_port_scan(manual=False)
         self.auto_refresh_id = self.after(3000, do_refresh)
 
+    def _schedule_pool_eviction(self):
+        """Раз в секунду закрывать порты, простоявшие в пуле дольше его idle_timeout."""
+        self.probe_pool.evict_idle()
+        self.evict_id = self.after(1000, self._schedule_pool_eviction)
+
     def _cancel_auto_refresh_ports(self):
         if self.auto_refresh_id:
             self.after_cancel(self.auto_refresh_id)
@@ -246,21 +340,65 @@ class GeneratorApp(ctk.CTk):
 
     def _connect(self):
         self._cancel_auto_refresh_ports()
+        if self.connect_wait_id:
+            self.after_cancel(self.connect_wait_id)
+            self.connect_wait_id = None
+        self.btn_connect.configure(state="normal")
         port = self.port_var.get().strip()
         if not port or port.startswith("—"):
             self._log("Выберите COM-порт.", "warn")
             return
+        if self.probe_pool.busy(port):
+            self._wait_port_check(port)
+            return
+        ser = None
+        checked_out = False
         try:
-            self.ser = serial.Serial(port, BAUD, timeout=0.1, write_timeout=1.0)
+            _load_backend()
+            ser = self.probe_pool.take(port)
+            if ser is not None:
+                # порт уже открыт сканированием и устройство опознано
+                checked_out = True
+                ser.timeout = 0.1
+                ser.write_timeout = 1.0
+                ser.reset_input_buffer()
+            else:
+                # открываем сами; пока сессия держит порт, сканирование его не трогает
+                if not self.probe_pool.check_out(port):
+                    self._wait_port_check(port)
+                    return
+                checked_out = True
+                ser = serial.Serial(port, BAUD, timeout=0.1, write_timeout=1.0)
+            self.ser = ser
+            self.session_port = port
+            if port != self.last_port:
+                self.last_port = port
+                save_last_port(port)
             self._set_controls_connected(True)
             self.label_status.configure(text=f"Подключено: {port}", text_color="lime")
             self._log(f"Подключено к {port} @ {BAUD}")
             self._start_read_loop()
         except Exception as e:
+            if ser is not None and self.ser is None:
+                try:
+                    ser.close()
+                except Exception:
+                    pass
+            if checked_out and self.ser is None:
+                self.probe_pool.check_in(port)
             self._log(f"Ошибка: {e}", "err")
             self.label_status.configure(text="Ошибка подключения", text_color="red")
             self._schedule_auto_refresh_ports()
 
+    def _wait_port_check(self, port: str):
+        """
+        Порт сейчас проверяет сканирование: второй хэндл сбросил бы плату
+        (а в Windows не открылся бы) — дожидаемся проверки и забираем её хэндл.
+        """
+        self.btn_connect.configure(state="disabled")
+        self.label_status.configure(text=f"Ожидание проверки {port}...", text_color="gray")
+        self.connect_wait_id = self.after(100, self._connect)
+
     def _disconnect(self):
         if self.after_id:
             self.after_cancel(self.after_id)
@@ -271,6 +409,9 @@ class GeneratorApp(ctk.CTk):
             except Exception:
                 pass
             self.ser = None
+        if self.session_port:
+            self.probe_pool.check_in(self.session_port)
+            self.session_port = None
         self._set_controls_connected(False)
         self.label_status.configure(text="Не подключено", text_color="gray")
         self.state_label.configure(text="—", text_color="gray")
@@ -409,12 +550,27 @@ class GeneratorApp(ctk.CTk):
         if self.after_id:
             self.after_cancel(self.after_id)
         self._cancel_auto_refresh_ports()
+        for timer_id in (self.evict_id, self.connect_wait_id):
+            if timer_id:
+                self.after_cancel(timer_id)
         self._disconnect()
+        self.probe_pool.close_all()
         self.destroy()
 
 
-def main():
+def main(argv: list[str] | None = None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="GUI для UART-генератора")
+    parser.add_argument(
+        "--profile-startup",
+        action="store_true",
+        help="вывести фазы запуска и закрыться после первого сканирования",
+    )
+    args = parser.parse_args(argv)
+
     app = GeneratorApp()
+    app.exit_after_startup = args.profile_startup
     app.protocol("WM_DELETE_WINDOW", app.on_closing)
     app.mainloop()
 
@@ -3,11 +3,8 @@
 Вынесено для тестирования без GUI и без serial.
 """
 import re
-
-try:
-    import serial
-except ImportError:
-    serial = None
+import threading
+import time
 
 BAUD = 115200
 FREQ_MIN, FREQ_MAX = 1, 40_000_000
@@ -18,6 +15,18 @@ DEVICE_ID_PREFIX = "UART-GEN"
 STATUS_RE = re.compile(r"FREQ=(\d+)\s+DUTY=(\d+)\s+(ON|OFF)")
 
 
+def _serial_module():
+    """
+    pyserial импортируется при первом обращении к порту, а не при импорте
+    модуля: иначе он замедляет старт GUI. None — если pyserial не установлен.
+    """
+    try:
+        import serial
+    except ImportError:
+        return None
+    return serial
+
+
 def build_freq_cmd(hz: int) -> str:
     """Команда установки частоты (Гц)."""
     if not (FREQ_MIN <= hz <= FREQ_MAX):
@@ -78,59 +87,294 @@ def is_err_response(line: str) -> bool:
     return line.strip().startswith("ERR ")
 
 
+def _identify_open_port(ser, timeout: float) -> bool:
+    """
+    На уже открытом порту шлёт VER? (дважды — первый может потеряться сразу
+    после загрузки) и ждёт в ответе DEVICE_ID_PREFIX не дольше timeout секунд.
+    """
+    ser.reset_input_buffer()
+    cmd = (build_id_cmd() + "\n").encode("ascii")
+    ser.write(cmd)
+    ser.flush()
+    time.sleep(0.15)
+    ser.write(cmd)
+    ser.flush()
+    deadline = time.monotonic() + timeout
+    buf = ""
+    while time.monotonic() < deadline:
+        chunk = ser.read(512).decode("ascii", errors="replace")
+        if chunk:
+            buf += chunk
+        else:
+            time.sleep(0.03)
+            continue
+        if is_our_generator_response(buf):
+            return True
+        if len(buf) > 2048:
+            buf = buf[-1024:]
+    return False
+
+
+def open_generator_port(
+    port: str,
+    baud: int = BAUD,
+    timeout: float = 5.0,
+    boot_delay: float = 2.5,
+):
+    """
+    Открывает порт, ждёт загрузки платы и проверяет, что это наш генератор.
+    Возвращает открытый serial.Serial (вызывающий отвечает за close) или None.
+    """
+    serial = _serial_module()
+    if serial is None:
+        return None
+    try:
+        ser = serial.Serial(port, baud, timeout=0.15, write_timeout=2.0)
+    except Exception:
+        return None
+    try:
+        ser.dtr = False
+        ser.rts = False
+        time.sleep(boot_delay)
+        if _identify_open_port(ser, timeout - boot_delay):
+            return ser
+    except Exception:
+        pass
+    try:
+        ser.close()
+    except Exception:
+        pass
+    return None
+
+
 def probe_generator_on_port(
     port: str,
     baud: int = BAUD,
     timeout: float = 5.0,
     boot_delay: float = 2.5,
+    pool: "ProbePool | None" = None,
 ) -> bool:
     """
     Проверяет, отвечает ли на порту наш UART-генератор: шлём VER?, по ответу
     определяем устройство (наличие DEVICE_ID_PREFIX в ответе).
+    Если передан pool, опознанный порт не закрывается, а кладётся в пул —
+    последующее подключение возьмёт его без повторного открытия (и сброса платы).
+    Порт, уже лежащий в пуле, не открывается заново, а перепроверяется (refresh).
     """
-    if serial is None:
-        return False
-    import time
+    if pool is None:
+        ser = open_generator_port(port, baud, timeout=timeout, boot_delay=boot_delay)
+        if ser is None:
+            return False
+        try:
+            ser.close()
+        except Exception:
+            pass
+        return True
+    if not pool.reserve(port):
+        return pool.refresh(port)
+    ser = None
     try:
-        ser = serial.Serial(port, baud, timeout=0.15, write_timeout=2.0)
+        ser = open_generator_port(port, baud, timeout=timeout, boot_delay=boot_delay)
+    finally:
+        pool.release(port, ser)
+    return ser is not None
+
+
+class ProbePool:
+    """
+    Пул открытых и опознанных портов после сканирования.
+    Повторное открытие порта USB CDC может перезагрузить плату (и снова ждать
+    delay в setup()), поэтому найденный генератор держим открытым, пока им
+    не воспользуются или пока он не пролежит в пуле idle_timeout секунд.
+
+    Порт, который сейчас проверяется (reserve/release или refresh), помечен
+    занятым: take() его не отдаёт (или ждёт окончания проверки), и второй
+    хэндл на то же устройство не открывается. Порт, отданный сессии (take()
+    или check_out()), не проверяется и не открывается сканированием, пока сессия
+    не вернёт его через check_in(). Порт, закрытый по простою, больше не
+    удерживается до forget_released() — повторные сканирования проверяют его
+    и сразу закрывают.
+    Потокобезопасен: сканирование работает в фоновом потоке.
+    """
+
+    def __init__(self, idle_timeout: float = 15.0, clock=time.monotonic):
+        self.idle_timeout = idle_timeout
+        self._clock = clock
+        self._cond = threading.Condition()
+        # port -> [serial или None (идёт первая проверка), время помещения в пул, занят]
+        self._ports: dict[str, list] = {}
+        self._released: set[str] = set()
+        self._checked_out: set[str] = set()
+
+    @staticmethod
+    def _close(ser) -> None:
+        if ser is None:
+            return
         try:
-            ser.dtr = False
-            ser.rts = False
-            time.sleep(boot_delay)
-            ser.reset_input_buffer()
-            cmd = (build_id_cmd() + "\n").encode("ascii")
-            ser.write(cmd)
-            ser.flush()
-            time.sleep(0.15)
-            ser.write(cmd)
-            ser.flush()
-            deadline = time.monotonic() + (timeout - boot_delay)
-            buf = ""
-            while time.monotonic() < deadline:
-                chunk = ser.read(512).decode("ascii", errors="replace")
-                if chunk:
-                    buf += chunk
-                else:
-                    time.sleep(0.03)
-                    continue
-                if is_our_generator_response(buf):
-                    return True
-                if len(buf) > 2048:
-                    buf = buf[-1024:]
-            return False
-        finally:
             ser.close()
-    except Exception:
-        return False
+        except Exception:
+            pass
+
+    def ports(self) -> list[str]:
+        with self._cond:
+            return [p for p, entry in self._ports.items() if entry[0] is not None]
+
+    def busy(self, port: str) -> bool:
+        """Идёт ли сейчас проверка порта (первое открытие или refresh)."""
+        with self._cond:
+            entry = self._ports.get(port)
+            return entry is not None and entry[2]
+
+    def check_out(self, port: str) -> bool:
+        """
+        Сессия открывает порт в обход пула: сканирование его не трогает до check_in().
+        False — порт сейчас проверяется, открывать его нельзя.
+        """
+        with self._cond:
+            entry = self._ports.get(port)
+            if entry is not None and entry[2]:
+                return False
+            self._checked_out.add(port)
+            return True
+
+    def check_in(self, port: str) -> None:
+        """Сессия закрыла порт — его снова можно проверять."""
+        with self._cond:
+            self._checked_out.discard(port)
+
+    def reserve(self, port: str) -> bool:
+        """
+        Пометить порт занятым перед первым открытием. False — порт уже в пуле
+        (его нужно проверять через refresh) или отдан сессии (его трогать нельзя).
+        Повторный reserve ещё не открытого порта допустим: так резервирование
+        можно сделать заранее из потока GUI.
+        """
+        with self._cond:
+            if port in self._checked_out:
+                return False
+            entry = self._ports.get(port)
+            if entry is not None and entry[0] is not None:
+                return False
+            if entry is None:
+                self._ports[port] = [None, self._clock(), True]
+            return True
+
+    def release(self, port: str, ser=None) -> None:
+        """
+        Завершить reserve: опознанный порт (ser) остаётся в пуле, иначе резерв снимается.
+        Порт, ранее закрытый по простою, в пул не кладётся и закрывается.
+        """
+        keep = False
+        with self._cond:
+            entry = self._ports.get(port)
+            if entry is not None and entry[0] is None:
+                if ser is not None and port not in self._released:
+                    self._ports[port] = [ser, self._clock(), False]
+                    keep = True
+                else:
+                    del self._ports[port]
+            self._cond.notify_all()
+        if not keep:
+            self._close(ser)
+
+    def take(self, port: str, timeout: float = 0.0):
+        """
+        Забрать открытый порт из пула (владение переходит вызывающему) или None.
+        Если порт сейчас проверяется, ждёт окончания проверки не дольше timeout секунд.
+        Отданный порт считается занятым сессией до check_in().
+        """
+        self.evict_idle()
+        with self._cond:
+            self._cond.wait_for(lambda: not self._busy_locked(port), timeout)
+            entry = self._ports.get(port)
+            if entry is None or entry[2] or entry[0] is None:
+                return None
+            del self._ports[port]
+            self._checked_out.add(port)
+        ser = entry[0]
+        if not getattr(ser, "is_open", False):
+            self.check_in(port)
+            self._close(ser)
+            return None
+        return ser
+
+    def _busy_locked(self, port: str) -> bool:
+        entry = self._ports.get(port)
+        return entry is not None and entry[2]
+
+    def discard(self, port: str) -> None:
+        with self._cond:
+            entry = self._ports.pop(port, None)
+            self._cond.notify_all()
+        if entry is not None:
+            self._close(entry[0])
+
+    def evict_idle(self) -> list[str]:
+        """
+        Закрыть порты, пролежавшие в пуле дольше idle_timeout (занятые проверкой
+        не трогаются). Возвращает их имена.
+        """
+        now = self._clock()
+        with self._cond:
+            expired = [
+                p for p, (ser, t, busy) in self._ports.items()
+                if ser is not None and not busy and now - t >= self.idle_timeout
+            ]
+            entries = [self._ports.pop(p) for p in expired]
+            self._released.update(expired)
+        for ser, _, _ in entries:
+            self._close(ser)
+        return expired
+
+    def forget_released(self) -> None:
+        """Снова разрешить удерживать порты, закрытые по простою (ручное обновление)."""
+        with self._cond:
+            self._released.clear()
+
+    def close_all(self) -> None:
+        with self._cond:
+            entries = list(self._ports.values())
+            self._ports.clear()
+            self._cond.notify_all()
+        for ser, _, _ in entries:
+            self._close(ser)
+
+    def refresh(self, port: str, timeout: float = 0.5) -> bool:
+        """
+        Быстрая повторная проверка порта из пула (без открытия и без boot_delay).
+        Время помещения в пул не продлевается: неиспользованный порт всё равно
+        закроется через idle_timeout. При неудаче порт закрывается и удаляется.
+        """
+        with self._cond:
+            entry = self._ports.get(port)
+            if entry is None or entry[0] is None or entry[2]:
+                return False
+            entry[2] = True
+            ser = entry[0]
+        try:
+            ok = bool(getattr(ser, "is_open", False)) and _identify_open_port(ser, timeout)
+        except Exception:
+            ok = False
+        with self._cond:
+            still_pooled = self._ports.get(port) is entry
+            if still_pooled:
+                if ok:
+                    entry[2] = False
+                else:
+                    del self._ports[port]
+            self._cond.notify_all()
+        if not (ok and still_pooled):
+            self._close(ser)
+        return ok and still_pooled
 
 
 def probe_generator_debug(port: str, baud: int = BAUD, wait_after_open: float = 2.5) -> tuple[bool, str]:
     """
     Открывает порт, ждёт, шлёт VER?, читает 1.5 сек. Возвращает (найден_генератор, сырой_ответ).
     """
+    serial = _serial_module()
     if serial is None:
         return False, "pyserial не установлен"
-    import time
     try:
         ser = serial.Serial(port, baud, timeout=0.2, write_timeout=2.0)
         try:
@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+"""
+Программы-последовательности для UART-генератора.
+
+Файл программы компилируется в список шагов с заранее закодированными
+байтами и абсолютными дедлайнами (смещение от старта), затем шаги
+отправляются планировщиком по монотонным часам. Ошибки ожидания не
+накапливаются: каждый дедлайн отсчитывается от одной точки старта.
+
+Формат программы (одна инструкция в строке, время в миллисекундах,
+всё после '#' — комментарий):
+
+    FREQ 1000              # обычные команды протокола: FREQ, DUTY, ON, OFF, ?
+    ON
+    WAIT 200               # сдвинуть время на 200 мс
+    RAMP DUTY 10 90 2000   # рампа скважности 10→90 за 2 с (шаг 50 мс)
+    RAMP FREQ 100 1000 500 STEP 10
+    BURST 20 1000          # ON/OFF с частотой 20 Гц в течение 1 с
+"""
+import statistics
+import time
+from dataclasses import dataclass, field
+
+from protocol import (
+    BAUD,
+    build_freq_cmd,
+    build_duty_cmd,
+    build_on_cmd,
+    build_off_cmd,
+    build_status_cmd,
+    is_ok_response,
+    is_err_response,
+    open_generator_port,
+)
+
+RAMP_STEP_MS = 50
+# Полупериод пачки не короче 1 мс: время программы задаётся в миллисекундах
+BURST_HZ_MAX = 500
+# Защита от опечаток: одна строка программы не порождает больше шагов
+STEPS_PER_LINE_MAX = 100_000
+# За сколько до дедлайна прекращаем спать и переходим к активному ожиданию
+SPIN_LEAD_S = 0.002
+# Коэффициент сглаживания оценки задержки записи (EMA)
+LATENCY_ALPHA = 0.2
+
+
+@dataclass(frozen=True)
+class Step:
+    """Один шаг программы: момент отправки (с от старта), команда и её байты."""
+    at: float
+    cmd: str
+    payload: bytes
+
+
+@dataclass
+class SequenceReport:
+    """Итог выполнения: опоздание каждого шага (с) относительно дедлайна."""
+    lateness: list[float] = field(default_factory=list)
+    write_times: list[float] = field(default_factory=list)
+    errors: list[str] = field(default_factory=list)  # ответы ERR … от прошивки
+    ok_replies: int = 0
+    cancelled: bool = False
+
+    @property
+    def steps(self) -> int:
+        return len(self.lateness)
+
+    @property
+    def mean_lateness(self) -> float:
+        return statistics.fmean(self.lateness) if self.lateness else 0.0
+
+    @property
+    def max_lateness(self) -> float:
+        return max(self.lateness, default=0.0)
+
+    @property
+    def jitter(self) -> float:
+        """Стандартное отклонение опоздания (с)."""
+        return statistics.pstdev(self.lateness) if len(self.lateness) > 1 else 0.0
+
+    def summary(self) -> str:
+        return (
+            f"шагов: {self.steps}, опоздание ср. {self.mean_lateness * 1e3:.3f} мс, "
+            f"макс. {self.max_lateness * 1e3:.3f} мс, джиттер {self.jitter * 1e3:.3f} мс"
+            + f", ответов OK {self.ok_replies}, ERR {len(self.errors)}"
+            + (" (прервано)" if self.cancelled else "")
+        )
+
+
+def _encode(cmd: str) -> bytes:
+    return (cmd + "\n").encode("ascii")
+
+
+def _parse_int(token: str, lineno: int) -> int:
+    try:
+        return int(token)
+    except ValueError:
+        raise ValueError(f"Строка {lineno}: ожидалось целое число, получено {token!r}") from None
+
+
+def _ramp_values(start: int, end: int, count: int) -> list[int]:
+    """count+1 значений от start до end включительно (равномерно, с округлением)."""
+    return [round(start + (end - start) * i / count) for i in range(count + 1)]
+
+
+def compile_program(text: str) -> list[Step]:
+    """
+    Компилирует текст программы в шаги с абсолютными смещениями.
+    Значения проверяются билдерами протокола; при ошибке — ValueError с номером строки.
+    """
+    steps: list[Step] = []
+    t_ms = 0
+
+    def emit(at_ms: float, cmd: str) -> None:
+        steps.append(Step(at_ms / 1000.0, cmd, _encode(cmd)))
+
+    for lineno, raw in enumerate(text.splitlines(), start=1):
+        tokens = raw.split("#", 1)[0].upper().split()
+        if not tokens:
+            continue
+        op, args = tokens[0], tokens[1:]
+        try:
+            if op == "WAIT" and len(args) == 1:
+                ms = _parse_int(args[0], lineno)
+                if ms < 0:
+                    raise ValueError("время не может быть отрицательным")
+                t_ms += ms
+            elif op == "FREQ" and len(args) == 1:
+                emit(t_ms, build_freq_cmd(_parse_int(args[0], lineno)))
+            elif op == "DUTY" and len(args) == 1:
+                emit(t_ms, build_duty_cmd(_parse_int(args[0], lineno)))
+            elif op in ("ON", "START") and not args:
+                emit(t_ms, build_on_cmd())
+            elif op in ("OFF", "STOP") and not args:
+                emit(t_ms, build_off_cmd())
+            elif op in ("?", "STATUS") and not args:
+                emit(t_ms, build_status_cmd())
+            elif op == "RAMP" and len(args) in (4, 6) and args[0] in ("FREQ", "DUTY"):
+                builder = build_freq_cmd if args[0] == "FREQ" else build_duty_cmd
+                start, end, ms = (_parse_int(a, lineno) for a in args[1:4])
+                step_ms = RAMP_STEP_MS
+                if len(args) == 6:
+                    if args[4] != "STEP":
+                        raise ValueError(f"ожидалось STEP, получено {args[4]!r}")
+                    step_ms = _parse_int(args[5], lineno)
+                if ms <= 0 or step_ms <= 0:
+                    raise ValueError("длительность и шаг рампы должны быть > 0")
+                count = max(1, ms // step_ms)
+                if count + 1 > STEPS_PER_LINE_MAX:
+                    raise ValueError(f"рампа даёт больше {STEPS_PER_LINE_MAX} шагов")
+                for i, value in enumerate(_ramp_values(start, end, count)):
+                    emit(t_ms + ms * i / count, builder(value))
+                t_ms += ms
+            elif op == "BURST" and len(args) == 2:
+                hz, ms = (_parse_int(a, lineno) for a in args)
+                if hz <= 0 or ms <= 0:
+                    raise ValueError("частота и длительность пачки должны быть > 0")
+                if hz > BURST_HZ_MAX:
+                    raise ValueError(f"частота пачки больше {BURST_HZ_MAX} Гц (полупериод < 1 мс)")
+                half_ms = 500.0 / hz
+                periods = int(ms // (2 * half_ms))
+                if periods == 0:
+                    raise ValueError("длительность пачки меньше одного периода")
+                if 2 * periods > STEPS_PER_LINE_MAX:
+                    raise ValueError(f"пачка даёт больше {STEPS_PER_LINE_MAX} шагов")
+                for i in range(periods):
+                    emit(t_ms + 2 * i * half_ms, build_on_cmd())
+                    emit(t_ms + (2 * i + 1) * half_ms, build_off_cmd())
+                t_ms += ms
+            else:
+                raise ValueError(f"неизвестная инструкция {raw.strip()!r}")
+        except ValueError as e:
+            if str(e).startswith("Строка "):
+                raise
+            raise ValueError(f"Строка {lineno}: {e}") from None
+    return steps
+
+
+def load_program(path: str) -> list[Step]:
+    """Читает файл программы и компилирует его."""
+    with open(path, encoding="utf-8") as f:
+        return compile_program(f.read())
+
+
+def firmware_rejects(steps: list[Step]) -> list[Step] | None:
+    """
+    Прогоняет байты шагов через src/cmd_parse.c, собранный для хоста
+    (cmd_parse_host; отличия от Arduino-прошивки описаны там).
+    Возвращает отвергнутые шаги или None, если сборка недоступна.
+    """
+    import cmd_parse_host
+
+    if not steps or not cmd_parse_host.available():
+        return None if steps else []
+    result = cmd_parse_host.parse_batch(b"".join(s.payload for s in steps)[:-1])
+    return [steps[i] for i in result.bad_lines()]
+
+
+def _drain_replies(ser, rx: bytearray, report: SequenceReport) -> None:
+    """Забрать уже пришедшие байты (без ожидания) и учесть полные строки ответов."""
+    n = getattr(ser, "in_waiting", 0)
+    if not n:
+        return
+    rx += ser.read(n)
+    *lines, rest = rx.split(b"\n")
+    rx[:] = rest
+    for raw in lines:
+        line = raw.decode("ascii", errors="replace").strip()
+        if is_err_response(line):
+            report.errors.append(line)
+        elif is_ok_response(line):
+            report.ok_replies += 1
+
+
+def run_sequence(
+    ser,
+    steps: list[Step],
+    start_delay: float = 0.05,
+    stop_event=None,
+    reply_tail: float = 0.1,
+    clock=time.monotonic,
+    sleep=time.sleep,
+) -> SequenceReport:
+    """
+    Отправляет шаги в порт ser по абсолютным дедлайнам от общего старта.
+
+    Запись начинается раньше дедлайна на сглаженную оценку задержки write(),
+    чтобы байты уходили к моменту дедлайна; последние SPIN_LEAD_S секунд
+    перед отправкой — активное ожидание вместо sleep (у sleep грубое разрешение).
+    Опоздание шага = момент окончания write() − дедлайн.
+
+    Ответы прошивки (OK …/ERR …) вычитываются без блокировки после каждой
+    записи и ещё reply_tail секунд после последней — иначе они копятся в буфере
+    и могут застопорить передачу устройства; ERR попадают в report.errors.
+    Если задан stop_event, ожидание идёт через stop_event.wait() и
+    прерывается сразу после его установки.
+    """
+    report = SequenceReport()
+    rx = bytearray()
+    t0 = clock() + start_delay
+    latency = 0.0
+    for step in steps:
+        if stop_event is not None and stop_event.is_set():
+            report.cancelled = True
+            break
+        deadline = t0 + step.at
+        target = deadline - latency
+        remaining = target - clock()
+        if remaining > SPIN_LEAD_S:
+            if stop_event is None:
+                sleep(remaining - SPIN_LEAD_S)
+            elif stop_event.wait(remaining - SPIN_LEAD_S):
+                report.cancelled = True
+                break
+        while clock() < target:
+            pass
+        w0 = clock()
+        ser.write(step.payload)
+        w1 = clock()
+        latency += LATENCY_ALPHA * ((w1 - w0) - latency)
+        report.write_times.append(w1 - w0)
+        report.lateness.append(w1 - deadline)
+        _drain_replies(ser, rx, report)
+    if not report.cancelled:
+        tail_end = clock() + reply_tail
+        while clock() < tail_end:
+            _drain_replies(ser, rx, report)
+            sleep(0.01)
+    _drain_replies(ser, rx, report)
+    return report
+
+
+def main(argv: list[str] | None = None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Выполнение программы на UART-генераторе")
+    mode = parser.add_mutually_exclusive_group(required=True)
+    mode.add_argument(
+        "run", nargs="*", default=[], metavar="PORT PROGRAM",
+        help="COM-порт генератора и файл программы",
+    )
+    mode.add_argument(
+        "--check", metavar="FILE", help="только проверить программу (без устройства)"
+    )
+    args = parser.parse_args(argv)
+    if args.check is None and len(args.run) != 2:
+        parser.error("нужны порт и файл программы (или --check FILE)")
+    port, program = (None, args.check) if args.check else args.run
+
+    steps = load_program(program)
+    rejected = firmware_rejects(steps)
+    if rejected:
+        for s in rejected:
+            print(f"{s.at * 1e3:.1f} мс: cmd_parse отвергает {s.cmd!r}")
+        return 1
+    if args.check:
+        checked = "проверено cmd_parse.c" if rejected is not None else "сборка cmd_parse.c недоступна"
+        print(f"шагов: {len(steps)}, {checked}")
+        return 0
+
+    # открытие порта перезагружает плату: ждём загрузки и ответа на VER?,
+    # иначе первые шаги программы уйдут в перезагрузку и потеряются
+    ser = open_generator_port(port, BAUD)
+    if ser is None:
+        print(f"{port}: генератор не отвечает")
+        return 1
+    try:
+        ser.timeout = 0.1
+        ser.write_timeout = 1.0
+        ser.reset_input_buffer()  # ответы на VER? при проверке порта
+        report = run_sequence(ser, steps)
+    finally:
+        ser.close()
+    for line in report.errors:
+        print(f"прошивка: {line}")
+    print(report.summary())
+    return 1 if report.errors else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,81 @@
+"""
+Быстрый старт GUI: профилировщик фаз запуска и запоминание последнего генератора.
+Без зависимостей от customtkinter и serial — импортируется до них.
+"""
+import json
+import os
+import time
+
+# Бюджет времени до готового к работе окна (с момента запуска процесса), с
+STARTUP_BUDGET_S = 1.0
+
+SETTINGS_PATH = os.path.join(os.path.expanduser("~"), ".uart_generator_gui.json")
+
+
+class StartupProfiler:
+    """
+    Отметки фаз запуска от общей точки отсчёта (time.perf_counter).
+    mark(name) фиксирует момент окончания фазы; длительность фазы —
+    от предыдущей отметки.
+    """
+
+    def __init__(self, t_start: float | None = None, clock=time.perf_counter):
+        self._clock = clock
+        self.t_start = clock() if t_start is None else t_start
+        self.marks: list[tuple[str, float]] = []
+
+    def mark(self, name: str, t: float | None = None) -> float:
+        """
+        Отметить конец фазы (сейчас или в момент t по тем же часам);
+        возвращает время от старта (с).
+        """
+        elapsed = (self._clock() if t is None else t) - self.t_start
+        self.marks.append((name, elapsed))
+        return elapsed
+
+    def elapsed(self, name: str) -> float | None:
+        """Время от старта до отметки name (с) или None, если её ещё нет."""
+        for n, t in self.marks:
+            if n == name:
+                return t
+        return None
+
+    def phases(self) -> list[tuple[str, float]]:
+        """Длительности фаз (с) в порядке отметок."""
+        out = []
+        prev = 0.0
+        for name, t in self.marks:
+            out.append((name, t - prev))
+            prev = t
+        return out
+
+    def within_budget(self, name: str = "interactive", budget: float = STARTUP_BUDGET_S) -> bool:
+        t = self.elapsed(name)
+        return t is not None and t <= budget
+
+    def report(self) -> str:
+        parts = [f"{name} {dt * 1e3:.0f} мс" for name, dt in self.phases()]
+        line = "Старт: " + ", ".join(parts)
+        t = self.elapsed("interactive")
+        if t is not None:
+            line += f"; до готовности {t * 1e3:.0f} мс (бюджет {STARTUP_BUDGET_S * 1e3:.0f} мс)"
+        return line
+
+
+def load_last_port(path: str = SETTINGS_PATH) -> str | None:
+    """Последний найденный/подключённый генератор из прошлых запусков."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            port = json.load(f).get("last_port")
+    except (OSError, ValueError, AttributeError):
+        return None
+    return port if isinstance(port, str) and port else None
+
+
+def save_last_port(port: str, path: str = SETTINGS_PATH) -> None:
+    """Запомнить генератор для следующего запуска (ошибки записи игнорируются)."""
+    try:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"last_port": port}, f)
+    except OSError:
+        pass
@@ -1,10 +1,17 @@
 """Интеграционные тесты GUI: логика без реального serial."""
+import os
+import subprocess
+import sys
+
 import pytest
 
 # Импорт после возможной установки зависимостей
 pytest.importorskip("customtkinter")
 
 from generator_gui import GeneratorApp, BAUD, FREQ_MIN, FREQ_MAX
+from startup import STARTUP_BUDGET_S
+
+GUI_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
 
 class TestGeneratorAppLogic:
@@ -33,3 +40,32 @@ class TestGeneratorAppLogic:
         app._connect()
         assert app.ser is None
         app.destroy()
+
+    def test_window_interactive_within_budget(self):
+        """
+        Бюджет считается от запуска процесса: отдельный python, сканирование заглушено.
+        Проверяется отметка профилировщика, а не время по стене (зависит от нагрузки машины).
+        """
+        code = (
+            "import generator_gui as g\n"
+            "def stop(self):\n"
+            "    print('INTERACTIVE', self.profiler.elapsed('interactive'), flush=True)\n"
+            "    self.on_closing()\n"
+            "g.GeneratorApp._refresh_ports = stop\n"
+            "g.main([])\n"
+        )
+        proc = subprocess.Popen(
+            [sys.executable, "-c", code],
+            cwd=GUI_DIR,
+            stdout=subprocess.PIPE,
+            text=True,
+        )
+        try:
+            line = proc.stdout.readline()
+            proc.wait(timeout=10)
+        finally:
+            proc.kill()
+            proc.stdout.close()
+        assert line.startswith("INTERACTIVE"), line
+        reported = float(line.split()[1])
+        assert reported <= STARTUP_BUDGET_S, f"до готовности окна {reported * 1e3:.0f} мс"
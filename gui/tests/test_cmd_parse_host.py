@@ -0,0 +1,133 @@
+"""Тесты парсера src/cmd_parse.c, собранного для хоста, и сверка с protocol.py."""
+import random
+
+import pytest
+
+import cmd_parse_host as host
+from cmd_parse_host import (
+    CMD_NONE,
+    CMD_FREQ,
+    CMD_DUTY,
+    CMD_ON,
+    CMD_OFF,
+    CMD_STATUS,
+    CMD_HELP,
+    PARSE_OK,
+    PARSE_UNKNOWN,
+    PARSE_BAD_VALUE,
+)
+from protocol import (
+    build_freq_cmd,
+    build_duty_cmd,
+    build_on_cmd,
+    build_off_cmd,
+    build_status_cmd,
+    FREQ_MIN,
+    FREQ_MAX,
+    DUTY_MIN,
+    DUTY_MAX,
+)
+from sequence import compile_program, firmware_rejects
+
+if not host.available():
+    pytest.skip("нет компилятора C для сборки cmd_parse", allow_module_level=True)
+
+
+class TestFirmwareParser:
+    """Те же случаи, что в test/test_cmd_parse.c."""
+
+    def test_simple_commands(self):
+        assert host.parse_line("") == (PARSE_OK, CMD_NONE, 0)
+        assert host.parse_line("  \r") == (PARSE_OK, CMD_NONE, 0)
+        assert host.parse_line("  ?  ") == (PARSE_OK, CMD_STATUS, 0)
+        assert host.parse_line("STATUS") == (PARSE_OK, CMD_STATUS, 0)
+        assert host.parse_line("START") == (PARSE_OK, CMD_ON, 0)
+        assert host.parse_line("STOP") == (PARSE_OK, CMD_OFF, 0)
+        assert host.parse_line("HELP") == (PARSE_OK, CMD_HELP, 0)
+
+    def test_values(self):
+        assert host.parse_line("FREQ 1000") == (PARSE_OK, CMD_FREQ, 1000)
+        assert host.parse_line("FREQ 0x10") == (PARSE_OK, CMD_FREQ, 16)
+        assert host.parse_line("DUTY 50  ") == (PARSE_OK, CMD_DUTY, 50)
+        assert host.parse_line("FREQ 0")[0] == PARSE_BAD_VALUE
+        assert host.parse_line("DUTY 101")[0] == PARSE_BAD_VALUE
+        assert host.parse_line("FREQ 10x")[0] == PARSE_UNKNOWN
+        assert host.parse_line("freq 1000")[0] == PARSE_UNKNOWN
+
+    def test_batch_alignment(self):
+        r = host.parse_batch(b"ON\r\nBAD\n\nDUTY 7\nOFF")
+        assert list(r.codes) == [PARSE_OK, PARSE_UNKNOWN, PARSE_OK, PARSE_OK, PARSE_OK]
+        assert list(r.types) == [CMD_ON, CMD_NONE, CMD_NONE, CMD_DUTY, CMD_OFF]
+        assert list(r.values) == [0, 0, 0, 7, 0]
+        assert r.bad_lines() == [1]
+
+    def test_embedded_newline_rejected(self):
+        with pytest.raises(ValueError):
+            host.parse_lines(["ON\nOFF"])
+
+
+class TestKnownDifferencesWithArduinoFirmware:
+    """
+    cmd_parse.c — не парсер прошивки по умолчанию: esp32c3_arduino разбирает команды
+    в processLine() (src/main_arduino.cpp). Здесь закреплено, чем они расходятся;
+    в комментариях — ответ Arduino-прошивки на ту же строку.
+    """
+
+    def test_trailing_space(self):
+        # Arduino: "ERR unknown command" — пробелы в конце не обрезаются
+        assert host.parse_line("ON ") == (PARSE_OK, CMD_ON, 0)
+
+    def test_garbage_after_number(self):
+        # Arduino: "OK FREQ 10" — endptr не проверяется
+        assert host.parse_line("FREQ 10x")[0] == PARSE_UNKNOWN
+
+    def test_identification(self):
+        # Arduino: "UART-GEN,1.0"
+        assert host.parse_line("VER?")[0] == PARSE_UNKNOWN
+        assert host.parse_line("ID?")[0] == PARSE_UNKNOWN
+
+    def test_unsigned_long_width(self):
+        # Arduino (32-битный unsigned long): strtoul даёт 1 → "OK FREQ 1"
+        assert host.parse_line("FREQ -4294967295")[0] == PARSE_BAD_VALUE
+
+    def test_long_line(self):
+        # Arduino: строка режется на 63 символа, хвост "ON" выполняется отдельной командой
+        assert host.parse_line("DUTY 5" + " " * 57 + "ON") == (PARSE_OK, CMD_DUTY, 5)
+
+
+class TestDifferentialWithProtocol:
+    """Всё, что строят билдеры protocol.py, cmd_parse принимает с тем же значением."""
+
+    def _check(self, builder, values, cmd_type):
+        accepted, rejected = [], []
+        for v in values:
+            try:
+                accepted.append((v, builder(v)))
+            except ValueError:
+                rejected.append(v)
+        r = host.parse_lines(cmd for _, cmd in accepted)
+        assert all(rc == PARSE_OK for rc in r.codes)
+        assert all(t == cmd_type for t in r.types)
+        assert list(r.values) == [v for v, _ in accepted]
+        # отвергнутое билдером cmd_parse тоже отвергает как значение вне диапазона
+        r = host.parse_lines(f"{builder(1).split()[0]} {v}" for v in rejected)
+        assert all(rc == PARSE_BAD_VALUE for rc in r.codes)
+
+    def test_freq(self):
+        rnd = random.Random(26)
+        values = [FREQ_MIN - 1, FREQ_MIN, FREQ_MAX, FREQ_MAX + 1, -1, 2**32 - 1]
+        values += [rnd.randint(0, FREQ_MAX * 2) for _ in range(20_000)]
+        self._check(build_freq_cmd, values, CMD_FREQ)
+
+    def test_duty(self):
+        values = list(range(DUTY_MIN - 5, DUTY_MAX + 50))
+        self._check(build_duty_cmd, values, CMD_DUTY)
+
+    def test_simple(self):
+        r = host.parse_lines([build_on_cmd(), build_off_cmd(), build_status_cmd()])
+        assert list(r.codes) == [PARSE_OK] * 3
+        assert list(r.types) == [CMD_ON, CMD_OFF, CMD_STATUS]
+
+    def test_sequence_program_accepted(self):
+        steps = compile_program("FREQ 1000\nON\nRAMP DUTY 0 100 1000 STEP 10\nBURST 50 200")
+        assert firmware_rejects(steps) == []
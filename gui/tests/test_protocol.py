@@ -1,7 +1,10 @@
 """Тесты протокола (команды и разбор ответов)."""
+import threading
+
 import pytest
 from protocol import (
     probe_generator_on_port,
+    ProbePool,
     build_id_cmd,
     is_our_generator_response,
     build_freq_cmd,
@@ -113,3 +116,196 @@ class TestProbePort:
     def test_empty_port_name_fails(self):
         # Пустое имя или несуществующий порт — не крашится, возвращает False
         assert probe_generator_on_port("", timeout=0.05) is False
+
+
+class FakePortHandle:
+    """Минимальная замена serial.Serial для пула и опознавания."""
+
+    def __init__(self, reply: bytes = b"UART-GEN,1.0\r\n"):
+        self.is_open = True
+        self.reply = reply
+        self.written = b""
+
+    def reset_input_buffer(self):
+        pass
+
+    def write(self, data: bytes) -> int:
+        self.written += data
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def read(self, n: int) -> bytes:
+        out, self.reply = self.reply[:n], self.reply[n:]
+        return out
+
+    def close(self):
+        self.is_open = False
+
+
+class TestProbePool:
+    def make_pool(self, idle_timeout: float = 10.0):
+        now = [0.0]
+        return ProbePool(idle_timeout=idle_timeout, clock=lambda: now[0]), now
+
+    @staticmethod
+    def pool_port(pool, port, ser):
+        """Как это делает сканирование: резерв, проверка, release с открытым хэндлом."""
+        assert pool.reserve(port) is True
+        pool.release(port, ser)
+
+    def test_take_hands_over_open_handle(self):
+        pool, _ = self.make_pool()
+        ser = FakePortHandle()
+        self.pool_port(pool, "COM3", ser)
+        assert "COM3" in pool.ports()
+        assert pool.take("COM3") is ser
+        assert ser.is_open is True
+        assert "COM3" not in pool.ports()
+        assert pool.take("COM3") is None
+
+    def test_idle_ports_are_evicted_and_closed(self):
+        pool, now = self.make_pool(idle_timeout=5.0)
+        ser = FakePortHandle()
+        self.pool_port(pool, "COM3", ser)
+        now[0] = 4.9
+        assert pool.evict_idle() == []
+        now[0] = 5.0
+        assert pool.evict_idle() == ["COM3"]
+        assert ser.is_open is False
+        assert pool.take("COM3") is None
+
+    def test_taken_port_is_not_probed_again(self, monkeypatch):
+        import protocol
+
+        pool, _ = self.make_pool()
+        ser = FakePortHandle()
+        self.pool_port(pool, "COM3", ser)
+        assert pool.take("COM3") is ser
+        # сканирование после подключения не открывает второй хэндл на порт сессии
+        opened = []
+        monkeypatch.setattr(protocol, "open_generator_port", lambda *a, **k: opened.append(a))
+        assert pool.reserve("COM3") is False
+        assert pool.refresh("COM3") is False
+        assert probe_generator_on_port("COM3", pool=pool) is False
+        assert opened == []
+        assert ser.written == b""
+        pool.check_in("COM3")
+        assert pool.reserve("COM3") is True
+
+    def test_check_out_blocks_scan_until_check_in(self):
+        pool, _ = self.make_pool()
+        assert pool.check_out("COM4") is True
+        assert pool.reserve("COM4") is False
+        pool.check_in("COM4")
+        assert pool.reserve("COM4") is True
+        assert pool.check_out("COM4") is False  # идёт проверка — открывать нельзя
+
+    def test_closed_handle_is_not_handed_out(self):
+        pool, _ = self.make_pool()
+        ser = FakePortHandle()
+        self.pool_port(pool, "COM3", ser)
+        ser.close()
+        assert pool.take("COM3") is None
+
+    def test_refresh_reidentifies_without_reopening(self):
+        pool, now = self.make_pool(idle_timeout=5.0)
+        ser = FakePortHandle()
+        self.pool_port(pool, "COM3", ser)
+        now[0] = 4.0
+        assert pool.refresh("COM3", timeout=0.5) is True
+        assert b"VER?\n" in ser.written
+        assert pool.take("COM3") is ser
+
+    def test_refresh_does_not_extend_idle_timeout(self):
+        pool, now = self.make_pool(idle_timeout=5.0)
+        ser = FakePortHandle()
+        self.pool_port(pool, "COM3", ser)
+        now[0] = 4.0
+        assert pool.refresh("COM3", timeout=0.5) is True
+        now[0] = 5.0  # отсчёт от момента put, а не от refresh
+        assert pool.evict_idle() == ["COM3"]
+        assert ser.is_open is False
+
+    def test_take_waits_for_running_refresh(self):
+        pool, _ = self.make_pool()
+        started, proceed = threading.Event(), threading.Event()
+
+        class SlowHandle(FakePortHandle):
+            def reset_input_buffer(self):
+                started.set()
+                proceed.wait(2.0)
+
+        ser = SlowHandle()
+        self.pool_port(pool, "COM3", ser)
+        t = threading.Thread(target=pool.refresh, args=("COM3", 0.5))
+        t.start()
+        assert started.wait(2.0)
+        assert pool.busy("COM3") is True
+        assert pool.take("COM3") is None  # без ожидания занятый порт не отдаётся
+        threading.Timer(0.05, proceed.set).start()
+        assert pool.take("COM3", timeout=5.0) is ser
+        t.join()
+        assert ser.is_open is True
+        assert pool.ports() == []
+
+    def test_reserve_blocks_take_until_release(self):
+        pool, _ = self.make_pool()
+        assert pool.reserve("COM3") is True
+        assert pool.reserve("COM3") is True  # резерв заранее из GUI + сканирование
+        assert pool.busy("COM3") is True
+        assert "COM3" not in pool.ports()
+        assert pool.take("COM3") is None
+        ser = FakePortHandle()
+        pool.release("COM3", ser)
+        assert pool.busy("COM3") is False
+        assert pool.reserve("COM3") is False  # уже в пуле — только refresh
+        assert pool.take("COM3") is ser
+
+    def test_release_without_handle_drops_reservation(self):
+        pool, _ = self.make_pool()
+        pool.reserve("COM3")
+        pool.release("COM3", None)
+        assert pool.busy("COM3") is False
+        assert pool.ports() == []
+
+    def test_idle_evicted_port_is_not_kept_again(self):
+        pool, now = self.make_pool(idle_timeout=5.0)
+        self.pool_port(pool, "COM3", FakePortHandle())
+        now[0] = 6.0
+        assert pool.evict_idle() == ["COM3"]
+        # автообновление снова находит порт, но не удерживает его открытым
+        again = FakePortHandle()
+        pool.reserve("COM3")
+        pool.release("COM3", again)
+        assert again.is_open is False
+        assert pool.ports() == []
+        # после ручного обновления — снова держим
+        pool.forget_released()
+        third = FakePortHandle()
+        pool.reserve("COM3")
+        pool.release("COM3", third)
+        assert pool.take("COM3") is third
+
+    def test_refresh_drops_silent_port(self):
+        pool, _ = self.make_pool()
+        ser = FakePortHandle(reply=b"")
+        self.pool_port(pool, "COM3", ser)
+        assert pool.refresh("COM3", timeout=0.05) is False
+        assert ser.is_open is False
+        assert "COM3" not in pool.ports()
+
+    def test_close_all(self):
+        pool, _ = self.make_pool()
+        handles = [FakePortHandle(), FakePortHandle()]
+        self.pool_port(pool, "COM3", handles[0])
+        self.pool_port(pool, "COM4", handles[1])
+        pool.close_all()
+        assert pool.ports() == []
+        assert not any(h.is_open for h in handles)
+
+    def test_failed_probe_leaves_pool_empty(self):
+        pool, _ = self.make_pool()
+        assert probe_generator_on_port("COM__NO_SUCH_PORT__", timeout=0.1, pool=pool) is False
+        assert pool.ports() == []
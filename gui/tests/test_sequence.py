@@ -0,0 +1,190 @@
+"""Тесты программ-последовательностей (компиляция и планировщик)."""
+import pytest
+from sequence import Step, compile_program, run_sequence, main, SequenceReport
+
+
+class FakeClock:
+    """Монотонные часы: sleep() сдвигает время, каждый вызов — на tick."""
+
+    def __init__(self, tick: float = 1e-5):
+        self.now = 100.0
+        self.tick = tick
+
+    def __call__(self) -> float:
+        self.now += self.tick
+        return self.now
+
+    def sleep(self, s: float) -> None:
+        self.now += s
+
+
+class FakeSerial:
+    def __init__(self, clock: FakeClock, write_cost: float = 0.0):
+        self.clock = clock
+        self.write_cost = write_cost
+        self.sent: list[tuple[float, bytes]] = []
+
+    def write(self, data: bytes) -> int:
+        self.sent.append((self.clock.now, data))
+        self.clock.now += self.write_cost
+        return len(data)
+
+
+class TestCompile:
+    def test_plain_commands_and_wait(self):
+        steps = compile_program("FREQ 1000\nON  # старт\n\nWAIT 200\nOFF\n")
+        assert [(s.at, s.cmd) for s in steps] == [
+            (0.0, "FREQ 1000"),
+            (0.0, "ON"),
+            (0.2, "OFF"),
+        ]
+        assert steps[0].payload == b"FREQ 1000\n"
+
+    def test_ramp(self):
+        steps = compile_program("RAMP DUTY 10 90 2000 STEP 500\nOFF")
+        assert [s.cmd for s in steps] == [
+            "DUTY 10", "DUTY 30", "DUTY 50", "DUTY 70", "DUTY 90", "OFF",
+        ]
+        assert [s.at for s in steps] == [0.0, 0.5, 1.0, 1.5, 2.0, 2.0]
+
+    def test_burst(self):
+        steps = compile_program("burst 20 100")
+        assert [(round(s.at, 4), s.cmd) for s in steps] == [
+            (0.0, "ON"), (0.025, "OFF"), (0.05, "ON"), (0.075, "OFF"),
+        ]
+
+    def test_errors_report_line(self):
+        with pytest.raises(ValueError, match="Строка 2"):
+            compile_program("ON\nDUTY 101")
+        with pytest.raises(ValueError, match="Строка 1"):
+            compile_program("JUMP 5")
+        with pytest.raises(ValueError, match="Строка 1"):
+            compile_program("WAIT abc")
+        with pytest.raises(ValueError, match="Строка 1"):
+            compile_program("RAMP FREQ 0 100 1000")
+
+    def test_burst_limits(self):
+        with pytest.raises(ValueError, match="меньше одного периода"):
+            compile_program("BURST 3 100")
+        with pytest.raises(ValueError, match="Гц"):
+            compile_program("BURST 501 1000")
+        with pytest.raises(ValueError, match="шагов"):
+            compile_program("BURST 500 3600000")
+        with pytest.raises(ValueError, match="шагов"):
+            compile_program("RAMP DUTY 0 100 3600000 STEP 1")
+
+
+class TestScheduler:
+    def test_deadlines_do_not_drift(self):
+        clock = FakeClock()
+        ser = FakeSerial(clock, write_cost=0.001)
+        steps = [Step(i * 0.01, "ON", b"ON\n") for i in range(200)]
+        report = run_sequence(ser, steps, start_delay=0.0, clock=clock, sleep=clock.sleep)
+        assert report.steps == 200
+        t0 = ser.sent[0][0]
+        # последний шаг — через 1.99 с от первого, без накопленной ошибки
+        assert ser.sent[-1][0] - t0 == pytest.approx(1.99, abs=0.002)
+        # после адаптации оценка задержки записи компенсирует write_cost
+        assert abs(report.lateness[-1]) < 0.0005
+        assert report.max_lateness < 0.0015
+        assert report.jitter < 0.001
+
+    def test_cancel(self):
+        clock = FakeClock()
+        ser = FakeSerial(clock)
+
+        class StopAfterFirst:
+            def is_set(self):
+                return len(ser.sent) >= 1
+
+            def wait(self, timeout):
+                clock.sleep(timeout)
+                return self.is_set()
+
+        steps = [Step(0.0, "ON", b"ON\n"), Step(0.1, "OFF", b"OFF\n")]
+        report = run_sequence(
+            ser, steps, stop_event=StopAfterFirst(), clock=clock, sleep=clock.sleep
+        )
+        assert report.cancelled is True
+        assert [d for _, d in ser.sent] == [b"ON\n"]
+
+    def test_cancel_interrupts_long_wait(self):
+        clock = FakeClock()
+        ser = FakeSerial(clock)
+
+        class StopDuringWait:
+            def __init__(self):
+                self.waited = []
+
+            def is_set(self):
+                return bool(self.waited)
+
+            def wait(self, timeout):
+                # событие установлено через 0.5 с ожидания, а не через минуту
+                self.waited.append(timeout)
+                clock.sleep(0.5)
+                return True
+
+        steps = [Step(0.0, "ON", b"ON\n"), Step(60.0, "OFF", b"OFF\n")]
+        report = run_sequence(
+            ser, steps, start_delay=0.0, stop_event=StopDuringWait(), clock=clock, sleep=clock.sleep
+        )
+        assert report.cancelled is True
+        assert [d for _, d in ser.sent] == [b"ON\n"]
+        assert clock.now < 101.0
+
+    def test_replies_are_drained_and_errors_reported(self):
+        clock = FakeClock()
+
+        class ReplyingSerial(FakeSerial):
+            def __init__(self, clock):
+                super().__init__(clock)
+                self.rx = b""
+
+            @property
+            def in_waiting(self):
+                return len(self.rx)
+
+            def write(self, data):
+                cmd = data.strip().decode()
+                self.rx += b"ERR DUTY 0..100\r\n" if cmd == "DUTY 200" else f"OK {cmd}\r\n".encode()
+                return super().write(data)
+
+            def read(self, n):
+                out, self.rx = self.rx[:n], self.rx[n:]
+                return out
+
+        ser = ReplyingSerial(clock)
+        steps = [Step(0.0, "ON", b"ON\n"), Step(0.01, "DUTY 200", b"DUTY 200\n"), Step(0.02, "OFF", b"OFF\n")]
+        report = run_sequence(ser, steps, start_delay=0.0, clock=clock, sleep=clock.sleep)
+        assert ser.rx == b""
+        assert report.ok_replies == 2
+        assert report.errors == ["ERR DUTY 0..100"]
+        assert "ERR 1" in report.summary()
+
+    def test_empty_report(self):
+        report = SequenceReport()
+        assert report.mean_lateness == 0.0
+        assert report.jitter == 0.0
+        assert "шагов: 0" in report.summary()
+
+
+class TestMain:
+    @pytest.mark.parametrize("argv", [[], ["COM5"], ["COM5", "a.txt", "b.txt"]])
+    def test_missing_arguments_are_usage_errors(self, argv):
+        with pytest.raises(SystemExit) as exc:
+            main(argv)
+        assert exc.value.code == 2
+
+    def test_check_and_run_are_exclusive(self, tmp_path):
+        program = tmp_path / "p.txt"
+        program.write_text("ON\n", encoding="utf-8")
+        with pytest.raises(SystemExit) as exc:
+            main(["--check", str(program), "COM5", str(program)])
+        assert exc.value.code == 2
+
+    def test_check_does_not_open_port(self, tmp_path, capsys):
+        program = tmp_path / "p.txt"
+        program.write_text("FREQ 1000\nON\nWAIT 10\nOFF\n", encoding="utf-8")
+        assert main(["--check", str(program)]) == 0
+        assert "шагов: 3" in capsys.readouterr().out
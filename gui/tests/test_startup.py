@@ -0,0 +1,60 @@
+"""Тесты профилировщика старта и запоминания последнего генератора."""
+from startup import (
+    StartupProfiler,
+    STARTUP_BUDGET_S,
+    load_last_port,
+    save_last_port,
+)
+
+
+class TestStartupProfiler:
+    def make(self):
+        now = [10.0]
+        return StartupProfiler(clock=lambda: now[0]), now
+
+    def test_phases(self):
+        prof, now = self.make()
+        prof.mark("import", 10.1)
+        now[0] = 10.25
+        prof.mark("ui_build")
+        now[0] = 10.3
+        prof.mark("interactive")
+        assert abs(prof.elapsed("interactive") - 0.3) < 1e-9
+        names = [n for n, _ in prof.phases()]
+        assert names == ["import", "ui_build", "interactive"]
+        durations = [round(dt, 3) for _, dt in prof.phases()]
+        assert durations == [0.1, 0.15, 0.05]
+        assert prof.elapsed("scan") is None
+
+    def test_budget(self):
+        prof, now = self.make()
+        assert prof.within_budget() is False  # отметки ещё нет
+        now[0] += STARTUP_BUDGET_S / 2
+        prof.mark("interactive")
+        assert prof.within_budget() is True
+        assert prof.within_budget(budget=STARTUP_BUDGET_S / 4) is False
+
+    def test_report(self):
+        prof, now = self.make()
+        now[0] += 0.2
+        prof.mark("interactive")
+        text = prof.report()
+        assert "interactive 200 мс" in text
+        assert "до готовности 200 мс" in text
+
+
+class TestLastPort:
+    def test_roundtrip(self, tmp_path):
+        path = str(tmp_path / "settings.json")
+        assert load_last_port(path) is None
+        save_last_port("COM5", path)
+        assert load_last_port(path) == "COM5"
+
+    def test_corrupt_file(self, tmp_path):
+        path = tmp_path / "settings.json"
+        path.write_text("{not json", encoding="utf-8")
+        assert load_last_port(str(path)) is None
+        path.write_text('["COM5"]', encoding="utf-8")
+        assert load_last_port(str(path)) is None
+        path.write_text('{"last_port": 5}', encoding="utf-8")
+        assert load_last_port(str(path)) is None